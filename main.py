@@ -2,9 +2,9 @@
 
 import logging
 from datetime import datetime
+from functools import lru_cache
 from itertools import cycle
 from pathlib import Path
-from string import ascii_uppercase
 from typing import Dict, List
 
 import click
@@ -12,7 +12,7 @@ import gspread
 import numpy as np
 import pandas as pd
 import yaml
-from gspread import WorksheetNotFound, Client, Worksheet
+from gspread import WorksheetNotFound, Client, Spreadsheet, Worksheet
 from gspread.utils import rowcol_to_a1
 from gspread_formatting import (
     Color,
@@ -28,23 +28,62 @@ from gspread_formatting import (
 # (0-based, so if row 3 in the sheet, set to 2)
 WEEK_ROW_NUMBER = 3
 
+# They are really quite beautiful
+_RGB_COLORS = [
+    (224, 187, 228),
+    (149, 125, 173),
+    (210, 145, 188),
+    (254, 200, 216),
+    (255, 223, 211),
+    (193, 231, 227),
+    (249, 240, 194),
+    (177, 212, 236),
+    (143, 193, 169),
+]
+
+# Formatting payloads reused on every run, built once at import time
+_BG_FORMATS = [
+    {
+        "backgroundColor": {
+            "red": rgb[0] / 256,
+            "green": rgb[1] / 256,
+            "blue": rgb[2] / 256,
+        }
+    }
+    for rgb in _RGB_COLORS
+]
+_CENTER_BOLD = {"horizontalAlignment": "CENTER", "textFormat": {"bold": True}}
+_BOLD = {"textFormat": {"bold": True}}
+_WRAP = {"wrapStrategy": "WRAP"}
+
 logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s", level=logging.INFO
 )
 logger = logging.getLogger(__name__)
 
 
+# Use the libyaml-based loader when available; it is considerably faster
+# than the pure-Python SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 def read_yaml_file(path: Path) -> Dict:
     with path.open("rt") as f:
-        contents = yaml.safe_load(f.read())
+        contents = yaml.load(f, Loader=_YAML_LOADER)
     return contents
 
 
+@lru_cache(maxsize=None)
+def open_spreadsheet(client: Client, spreadsheet_id: str) -> Spreadsheet:
+    """Open a spreadsheet by key, fetching its metadata only once per run."""
+    return client.open_by_key(spreadsheet_id)
+
+
 def pull_sheet_data(
     client: Client, spreadsheet_id: str, sheet_name: str
 ) -> List[List[str]]:
     """Get data from source spreadsheet as list of lists."""
-    sh = client.open_by_key(spreadsheet_id)
+    sh = open_spreadsheet(client, spreadsheet_id)
     worksheet = sh.worksheet(sheet_name)
     values = worksheet.get()
     if not values:
@@ -56,32 +95,19 @@ def pull_sheet_data(
     return values
 
 
+@lru_cache(maxsize=None)
 def excel_col_to_int(col: str) -> int:
-    col = col.upper()
-    num = 0
-    for c in col:
-        if c not in ascii_uppercase:
-            raise ValueError(f"Invalid column name {col}")
-        num = num * 26 + (ord(c) - ord("A")) + 1
-    return num - 1
+    # Treat the column name as base-26 digits and evaluate it with vectorized
+    # numpy arithmetic instead of a per-character loop
+    digits = np.frombuffer(col.upper().encode("ascii"), dtype=np.uint8) - ord("A")
+    if (digits >= 26).any():
+        raise ValueError(f"Invalid column name {col}")
+    return int((digits + 1) @ 26 ** np.arange(digits.size - 1, -1, -1)) - 1
 
 
 def add_planning_worksheet_formatting(
     worksheet: Worksheet, project_type_header: List[str]
 ) -> None:
-    # They are really quite beautiful
-    rgb_colors = [
-        (224, 187, 228),
-        (149, 125, 173),
-        (210, 145, 188),
-        (254, 200, 216),
-        (255, 223, 211),
-        (193, 231, 227),
-        (249, 240, 194),
-        (177, 212, 236),
-        (143, 193, 169),
-    ]
-
     # Determine the first and last cell of consecutive project types
     merge_ranges: List[List[int]] = []
     previous_val = None
@@ -94,39 +120,66 @@ def add_planning_worksheet_formatting(
             merge_ranges[-1][1] = i
         previous_val = project_type
 
+    # Accumulate all structural and formatting changes and send them as two
+    # batched API calls instead of one round-trip per range
+    structure_requests: List[Dict] = []
+    format_requests: List[Dict] = []
+
+    # Precompute the A1 column letters once instead of converting them on
+    # every loop iteration
+    max_col_idx = merge_ranges[-1][1] if merge_ranges else 0
+    col_letters = [rowcol_to_a1(1, i)[:-1] for i in range(1, max_col_idx + 1)]
+
     # Merge consecutive project type cells and color them
-    for merge_range, rgb in zip(merge_ranges, cycle(rgb_colors)):
+    for merge_range, bg_format in zip(merge_ranges, cycle(_BG_FORMATS)):
         start_col_idx = merge_range[0]
         end_col_idx = merge_range[1]
-        worksheet.merge_cells(1, start_col_idx, 1, end_col_idx)
-
-        color_range = ":".join(
-            [rowcol_to_a1(1, start_col_idx), rowcol_to_a1(1, end_col_idx)]
-        )
-        worksheet.format(
-            color_range,
+        structure_requests.append(
             {
-                "backgroundColor": {
-                    "red": rgb[0] / 256,
-                    "green": rgb[1] / 256,
-                    "blue": rgb[2] / 256,
+                "mergeCells": {
+                    "mergeType": "MERGE_ALL",
+                    "range": {
+                        "sheetId": worksheet.id,
+                        "startRowIndex": 0,
+                        "endRowIndex": 1,
+                        "startColumnIndex": start_col_idx - 1,
+                        "endColumnIndex": end_col_idx,
+                    },
                 }
-            },
+            }
         )
 
+        color_range = (
+            f"{col_letters[start_col_idx - 1]}1:{col_letters[end_col_idx - 1]}1"
+        )
+        format_requests.append({"range": color_range, "format": bg_format})
+
     # Center-align project names and make them bold
-    worksheet.format(
-        "1:2", {"horizontalAlignment": "CENTER", "textFormat": {"bold": True}}
-    )
+    format_requests.append({"range": "1:2", "format": _CENTER_BOLD})
 
     # Make the first column (with persons) bold
-    worksheet.format("A:A", {"textFormat": {"bold": True}})
+    format_requests.append({"range": "A:A", "format": _BOLD})
+
+    # Wrap text in project titles
+    format_requests.append({"range": "2:2", "format": _WRAP})
 
     # Freeze the first (person) column and the top 2 (project) rows
-    worksheet.freeze(rows=2, cols=1)
+    structure_requests.append(
+        {
+            "updateSheetProperties": {
+                "properties": {
+                    "sheetId": worksheet.id,
+                    "gridProperties": {"frozenRowCount": 2, "frozenColumnCount": 1},
+                },
+                "fields": (
+                    "gridProperties.frozenRowCount,gridProperties.frozenColumnCount"
+                ),
+            }
+        }
+    )
 
-    # Wrap text in project titles
-    worksheet.format("2:2", {"wrapStrategy": "WRAP"})
+    worksheet.spreadsheet.batch_update({"requests": structure_requests})
+    worksheet.batch_format(format_requests)
 
     # Add conditional formatting, to create gradient for hour numbers
     grad_color = Color(102 / 256, 205 / 256, 170 / 256)
@@ -155,67 +208,103 @@ def get_week_planning(
 ) -> pd.DataFrame:
     data = pull_sheet_data(client, spreadsheet_id, range_name)
 
-    df = pd.DataFrame(data, columns=None)
-
-    # First col is empty and is therefore dropped
-    df = df.drop(columns=df.columns[0], axis=1)
-    # Reset column labels
-    df.columns = range(df.columns.size)
+    # Pad the raw rows to equal length and build a single numpy array; the
+    # first (empty) column is dropped in the same step
+    width = max(map(len, data))
+    arr = np.array([row + [""] * (width - len(row)) for row in data], dtype=object)
+    arr = arr[:, 1:]
 
     # Get the col idx of the current week based on week number
-    week_row = df.iloc[WEEK_ROW_NUMBER, :]
-    col_idx_curr_week = week_row[week_row == str(week_number)].index.values[0]
-
-    # Only keep rows after the first empty row below the row with week numbers
-    df = df.loc[
-        WEEK_ROW_NUMBER:,
-    ]
-    idx_first_empty_row = df.index[df.isnull().all(axis=1)][0]
-    idx_first_project_row = idx_first_empty_row + 1
-    df = df.loc[
-        idx_first_project_row:,
-    ]
-
-    # Forward fill project type/name in the first two columns
-    df.loc[:, 0:1] = df.loc[:, 0:1].replace("", np.nan).ffill(axis=0)
-
-    # Only keep columns project_type, project_name, person and hours
-    df = df.loc[:, [0, 1, 2, col_idx_curr_week]]
+    col_idx_curr_week = int(
+        np.nonzero(arr[WEEK_ROW_NUMBER] == str(week_number))[0][0]
+    )
 
-    # Only keep full rows (project name, person and number of hours)
-    df.replace("", np.nan, inplace=True)
-    df.dropna(inplace=True, how="any")
+    # Only keep rows after the first empty row below the row with week numbers.
+    # Scan the raw rows and stop at the first hit instead of building a full
+    # boolean mask over the dataframe.
+    idx_first_empty_row = next(
+        idx
+        for idx, row in enumerate(data[WEEK_ROW_NUMBER:], start=WEEK_ROW_NUMBER)
+        if all(cell == "" for cell in row)
+    )
+    arr = arr[idx_first_empty_row + 1 :]
 
-    df.columns = ["project_type", "project", "person", "hours"]
+    # Forward fill project type/name in the first two columns
+    filled = pd.DataFrame(arr[:, :2]).replace("", np.nan).ffill(axis=0).to_numpy()
+
+    # Assemble only the four needed columns into the dataframe:
+    # project_type, project, person and hours
+    df = pd.DataFrame(
+        {
+            "project_type": filled[:, 0],
+            "project": filled[:, 1],
+            "person": arr[:, 2],
+            "hours": arr[:, col_idx_curr_week],
+        }
+    )
 
-    # Drop rows where hours == 0
-    df = df[df.hours != "0"]
-    # Drop rows with persons that start with "?"
-    df = df[~df.person.str.startswith("?")]
+    # Only keep full rows (project name, person and number of hours) with a
+    # single mask over the object array instead of a replace + dropna pass.
+    # Empty cells are "" except in the first two columns, where rows above
+    # the first project keep the NaN that forward filling could not reach.
+    values = df.to_numpy()
+    df = df[((values != "") & ~pd.isna(values)).all(axis=1)]
+
+    # Drop rows where hours == 0 and rows with persons that start with "?",
+    # in a single boolean-index step
+    mask = (df["hours"].to_numpy() != "0") & ~np.char.startswith(
+        df["person"].to_numpy().astype("U"), "?"
+    )
+    df = df[mask]
 
     df.set_index(keys=["project_type", "project"], inplace=True)
 
-    project_list = df.index.unique()
-    person_list = sorted(df["person"].unique())
-
-    # Create the overview_df (week planning) from df
-    overview_df = pd.DataFrame(columns=project_list, index=person_list)
-
-    for row in df.itertuples(index=True):
-        try:
-            hours = int(row.hours)
-        except ValueError:
-            logger.info(
-                f'Ignoring invalid hours value "{row.hours}" for project {row.Index}'
-            )
-            continue
-        overview_df.loc[row.person, row.Index] = hours
+    # No rows left for this week (e.g. hours not filled in yet): return an
+    # empty overview, since factorize cannot infer levels from an empty
+    # MultiIndex
+    if df.empty:
+        return pd.DataFrame(
+            columns=pd.MultiIndex.from_tuples([("", ""), ("Total", "")])
+        )
 
-    # Add column with hours week total per person
-    overview_df.loc[:, "Total"] = overview_df.sum(axis=1).astype(int)
+    # Factorize persons and projects in a single pass each, before invalid
+    # hours are dropped, so a person or project whose only entries are
+    # invalid keeps an (empty) row or column; persons are sorted, projects
+    # keep their sheet order
+    person_codes, person_list = df["person"].factorize(sort=True)
+    project_codes, project_list = df.index.factorize()
+
+    # Parse all hours values in one vectorized pass; values that do not
+    # parse as whole numbers are invalid, as with the int() parse this
+    # replaced
+    hours = pd.to_numeric(df["hours"], errors="coerce")
+    invalid = (hours.isna() | (hours % 1 != 0)).to_numpy()
+    for project, value in df.loc[invalid, "hours"].items():
+        logger.info(f'Ignoring invalid hours value "{value}" for project {project}')
+    person_codes = person_codes[~invalid]
+    project_codes = project_codes[~invalid]
+    # All remaining values are whole, so store them as compact int32 instead
+    # of the float64 that to_numeric produced
+    hours_values = hours.to_numpy()[~invalid].astype(np.int32)
+
+    # Dense-assign the hours into a person x project grid; the last column
+    # holds the hours week total per person
+    hours_grid = np.zeros((len(person_list), len(project_list)), dtype=np.int32)
+    hours_grid[person_codes, project_codes] = hours_values
+    grid = np.full((len(person_list), len(project_list) + 1), "", dtype=object)
+    grid[person_codes, project_codes] = hours_values.astype(object)
+    grid[:, -1] = hours_grid.sum(axis=1).astype(object)
+
+    # Create the overview_df (week planning) from the grid
+    overview_df = pd.DataFrame(
+        grid,
+        index=person_list,
+        columns=pd.MultiIndex.from_tuples(
+            [*project_list, ("Total", "")], names=["project_type", "project"]
+        ),
+    )
 
-    # Replace NaN with empty strings and reset index
-    overview_df.fillna("", inplace=True)
+    # Reset index
     overview_df.index.name = ""
     overview_df.reset_index(inplace=True)
     return overview_df
@@ -224,24 +313,46 @@ def get_week_planning(
 def write_week_planning_to_gsheet(
     client: Client, df: pd.DataFrame, spreadsheet_id: str, week_number: int
 ) -> None:
-    sht1 = client.open_by_key(spreadsheet_id)
+    sht1 = open_spreadsheet(client, spreadsheet_id)
 
-    # Create or replace worksheet
+    # Create the worksheet, or reuse it if it already exists: wiping its
+    # values, formatting and merges is one API call instead of the two needed
+    # to delete and recreate it
     new_worksheet_name = f"Week {week_number}"
     try:
         new_worksheet = sht1.worksheet(new_worksheet_name)
-        sht1.del_worksheet(new_worksheet)
-        logger.info(f"Worksheet {new_worksheet_name} already exists. Replacing.")
+        sht1.batch_update(
+            {
+                "requests": [
+                    {"unmergeCells": {"range": {"sheetId": new_worksheet.id}}},
+                    {
+                        "updateCells": {
+                            "range": {"sheetId": new_worksheet.id},
+                            "fields": "userEnteredValue,userEnteredFormat",
+                        }
+                    },
+                ]
+            }
+        )
+        logger.info(f"Worksheet {new_worksheet_name} already exists. Reusing.")
     except WorksheetNotFound:
-        logger.info(f"Worksheet {new_worksheet_name} created")
-    finally:
         new_worksheet = sht1.add_worksheet(
             title=new_worksheet_name, rows="100", cols="100", index=0
         )
+        logger.info(f"Worksheet {new_worksheet_name} created")
 
     header_row1 = [val[0] for val in df.columns]
     header_row2 = [val[1] for val in df.columns]
-    new_worksheet.update([header_row1, header_row2] + df.values.tolist())
+
+    # Assemble header rows and body into one pre-allocated array and send it
+    # as a single update; RAW skips the per-cell parsing on the Sheets side
+    values = np.empty((len(df) + 2, len(df.columns)), dtype=object)
+    values[0] = header_row1
+    values[1] = header_row2
+    values[2:] = df.to_numpy()
+    new_worksheet.update(
+        range_name="A1", values=values.tolist(), value_input_option="RAW"
+    )
 
     logger.info("Applying formatting to worksheet")
     add_planning_worksheet_formatting(